@@ -1,15 +1,45 @@
 """Configuración central de la aplicación.
 
-Carga variables de entorno desde un archivo .env.
+Carga variables de entorno desde un archivo .env. La lectura se hace en el
+primer uso de `get_settings()`, no al importar el módulo.
 """
 
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
-load_dotenv()
 
 class Settings:
     """Contenedor de variables de entorno usadas por la app."""
-    BALLDONTLIE_API_KEY: str | None = os.getenv("API_KEY")
-    CS2_BALLDONTLIE_API_URL: str | None = os.getenv("CS2_BALLDONTLIE_API_URL")
-    NBA_BALLDONTLIE_API_URL: str | None = os.getenv("NBA_BALLDONTLIE_API_URL")
\ No newline at end of file
+
+    def __init__(self):
+        """Lee las variables de entorno."""
+        self.BALLDONTLIE_API_KEY: str | None = os.getenv("API_KEY")
+        self.CS2_BALLDONTLIE_API_URL: str | None = os.getenv("CS2_BALLDONTLIE_API_URL")
+        self.NBA_BALLDONTLIE_API_URL: str | None = os.getenv("NBA_BALLDONTLIE_API_URL")
+        # Deportes habilitados (separados por coma); cada uno registra su router al iniciar
+        self.ENABLED_SPORTS: list[str] = [
+            sport.strip().lower() for sport in os.getenv("ENABLED_SPORTS", "cs2,nba").split(",") if sport.strip()
+        ]
+        # Límite de la API externa de CS2 y plazo máximo de espera por solicitud
+        self.CS2_REQUESTS_PER_MINUTE: int = int(os.getenv("CS2_REQUESTS_PER_MINUTE", "5"))
+        self.ADMISSION_MAX_WAIT_SECONDS: float = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "60"))
+        # Perfilado: token para /admin, umbral de solicitudes lentas (0 = apagado)
+        self.ADMIN_TOKEN: str | None = os.getenv("ADMIN_TOKEN")
+        self.PROFILING_SLOW_REQUEST_MS: float = float(os.getenv("PROFILING_SLOW_REQUEST_MS", "1000"))
+        self.PROFILING_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5"))
+        self.PROFILING_SLOW_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILING_SLOW_SAMPLE_INTERVAL_MS", "50"))
+        self.PROFILING_SLOW_REQUEST_HISTORY: int = int(os.getenv("PROFILING_SLOW_REQUEST_HISTORY", "50"))
+        # Cache de respuestas/cursores de CS2 y su archivo de persistencia (vacío = sin persistencia)
+        self.CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+        self.CACHE_MAX_STALE_SECONDS: float = float(os.getenv("CACHE_MAX_STALE_SECONDS", "3600"))
+        self.CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+        self.CACHE_FILE: str = os.getenv("CACHE_FILE", ".cache/balldontlie_cache.bin")
+        self.CACHE_CHECKPOINT_SECONDS: float = float(os.getenv("CACHE_CHECKPOINT_SECONDS", "60"))
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Devuelve la configuración, cargando el .env la primera vez."""
+    load_dotenv()
+    return Settings()
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""Benchmark de arranque en frío de la aplicación.
+
+Mide, en procesos nuevos de Python (sin módulos en caché):
+- import: tiempo de `import main`.
+- startup: tiempo del lifespan (registro de los deportes habilitados).
+
+Uso:
+    python benchmarks/startup_benchmark.py --runs 10
+    python benchmarks/startup_benchmark.py --sports cs2 --max-import-ms 400 --max-startup-ms 300
+
+Con --max-import-ms / --max-startup-ms termina con código 1 si la mediana
+supera el límite, para detectar regresiones en CI.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código que corre en cada proceso nuevo; imprime los tiempos en JSON
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def startup():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(startup())
+print(json.dumps({"import_ms": (imported - started) * 1000, "startup_ms": (ready - imported) * 1000}))
+"""
+
+
+def run_probe(sports: str | None) -> dict:
+    """Ejecuta una medición en un proceso nuevo."""
+    env = dict(os.environ)
+    # Sin persistencia del cache: no tocar el archivo real ni medir su carga
+    env["CACHE_FILE"] = ""
+    if sports is not None:
+        env["ENABLED_SPORTS"] = sports
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Corre el benchmark e imprime las medianas."""
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío")
+    parser.add_argument("--runs", type=int, default=5, help="cantidad de procesos a medir")
+    parser.add_argument("--sports", default=None, help="valor de ENABLED_SPORTS (por defecto el del .env)")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="límite para la mediana de import")
+    parser.add_argument("--max-startup-ms", type=float, default=None, help="límite para la mediana de startup")
+    args = parser.parse_args()
+
+    # Un proceso de calentamiento para que los .pyc ya estén compilados
+    run_probe(args.sports)
+    results = [run_probe(args.sports) for _ in range(args.runs)]
+
+    failed = False
+    for key, limit in (("import_ms", args.max_import_ms), ("startup_ms", args.max_startup_ms)):
+        values = [result[key] for result in results]
+        median = statistics.median(values)
+        line = f"{key:<11} mediana={median:8.1f}  min={min(values):8.1f}  max={max(values):8.1f}"
+        if limit is not None and median > limit:
+            line += f"  ✗ supera el límite de {limit:.0f} ms"
+            failed = True
+        print(line)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
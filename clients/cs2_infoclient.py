@@ -6,7 +6,7 @@ y maneja la autenticación y el armado de parámetros.
 
 import os, httpx
 from fastapi import FastAPI, HTTPException
-from appsettings import Settings
+from appsettings import get_settings
 
 class CS2BallDontLieClient:
     """Cliente de acceso a BallDontLie (CS2).
@@ -16,15 +16,16 @@ class CS2BallDontLieClient:
 
     def __init__(self):
         """Inicializa el cliente con la API key y la URL base."""
+        settings = get_settings()
         # Verifica que las variables de entorno estén configuradas
-        if not Settings.BALLDONTLIE_API_KEY or not Settings.CS2_BALLDONTLIE_API_URL:
+        if not settings.BALLDONTLIE_API_KEY or not settings.CS2_BALLDONTLIE_API_URL:
             raise HTTPException(
                 status_code=500,
                 detail="Error de configuración: Debes proporcionar la API key y la URL en el archivo .env",
             )
         # Guarda la API key y la URL base
-        self.api_key = Settings.BALLDONTLIE_API_KEY
-        self.api_url = Settings.CS2_BALLDONTLIE_API_URL.rstrip("/")
+        self.api_key = settings.BALLDONTLIE_API_KEY
+        self.api_url = settings.CS2_BALLDONTLIE_API_URL.rstrip("/")
         # Header de autorización requerido por la API
         self.headers = {"Authorization": self.api_key}
 
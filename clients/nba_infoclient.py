@@ -6,7 +6,7 @@ y maneja la autenticación y el armado de parámetros.
 
 import httpx
 from fastapi import HTTPException
-from appsettings import Settings
+from appsettings import get_settings
 
 
 
@@ -15,15 +15,16 @@ class NBABallDontLieClient:
 
     def __init__(self):
         """Inicializa el cliente con la API key y la URL base."""
+        settings = get_settings()
         # Verifica que las variables de entorno estén configuradas
-        if not Settings.BALLDONTLIE_API_KEY or not Settings.NBA_BALLDONTLIE_API_URL:
+        if not settings.BALLDONTLIE_API_KEY or not settings.NBA_BALLDONTLIE_API_URL:
             raise HTTPException(
                 status_code=500,
                 detail="Error de configuración: Debes proporcionar la API key y la URL en el archivo .env",
             )
         # Guarda la API key y la URL base
-        self.api_key = Settings.BALLDONTLIE_API_KEY
-        self.api_url = Settings.NBA_BALLDONTLIE_API_URL.rstrip("/")
+        self.api_key = settings.BALLDONTLIE_API_KEY
+        self.api_url = settings.NBA_BALLDONTLIE_API_URL.rstrip("/")
         # Header de autorización requerido por la API
         self.headers = {"Authorization": self.api_key}
 
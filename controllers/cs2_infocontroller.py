@@ -3,21 +3,210 @@
 Define rutas HTTP que exponen equipos y jugadores de CS2.
 """
 
-from fastapi import APIRouter, HTTPException
-import httpx, asyncio
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request
+import httpx
+from appsettings import get_settings
 from clients.cs2_infoclient import CS2BallDontLieClient
 from DTOs.cs2_infoDTO import PlayersResponseDTO, PlayerDTO, TeamDTO
+from services.admissionservice import AdmissionController, UpstreamBudget
+from services.cacheservice import ResponseCache, get_cache
 
 
 # Router para agrupar endpoints de CS2
 router = APIRouter(prefix="/cs2", tags=["cs2"])
 
-# Cliente que se comunica con la API externa
-client = CS2BallDontLieClient()
+# Llamador usado para los refrescos en segundo plano
+REFRESH_CALLER = "__refresh__"
+
+# Claves en refresco y tareas en curso (se guarda la referencia para que no se pierdan)
+_refreshing: set[str] = set()
+_background_tasks: set[asyncio.Task] = set()
+
+
+# Cliente que se comunica con la API externa (se crea en el primer uso)
+_client: CS2BallDontLieClient | None = None
+
+
+async def get_client() -> CS2BallDontLieClient:
+    """Devuelve el cliente, creándolo en la primera solicitud.
+
+    Es `async` para correr en el event loop: sin hilos por solicitud y sin
+    carreras al crearlo.
+    """
+    global _client
+    if _client is None:
+        _client = CS2BallDontLieClient()
+    return _client
+
+
+# Control de admisión según el presupuesto de la API externa (5 requests/min)
+_admission: AdmissionController | None = None
+
+
+async def get_admission() -> AdmissionController:
+    """Devuelve el control de admisión; debe ser uno solo para todo el proceso."""
+    global _admission
+    if _admission is None:
+        settings = get_settings()
+        _admission = AdmissionController(
+            UpstreamBudget(settings.CS2_REQUESTS_PER_MINUTE),
+            max_wait_seconds=settings.ADMISSION_MAX_WAIT_SECONDS,
+        )
+    return _admission
+
+
+async def get_response_cache() -> ResponseCache:
+    """Cache compartido de respuestas (dependencia que corre en el event loop)."""
+    return get_cache()
+
+
+def caller_id(request: Request) -> str:
+    """Identifica al llamador para la cuota justa (X-Client-Id o IP)."""
+    if request.headers.get("X-Client-Id"):
+        return request.headers["X-Client-Id"]
+    return request.client.host if request.client else "desconocido"
+
+
+def refresh_in_background(key: str, fetch, admission: AdmissionController, cache: ResponseCache, store=None):
+    """Vuelve a pedir una entrada vencida sin bloquear la solicitud actual.
+
+    Args:
+        key: clave del cache a refrescar.
+        fetch: corrutina `fetch(http_client)` que devuelve la respuesta nueva.
+        store: función `store(data)` que guarda la respuesta (por defecto en `key`).
+    """
+    if store is None:
+        store = lambda data: cache.set(key, data)
+    # Solo con el presupuesto libre: los refrescos nunca retrasan a los usuarios
+    if key in _refreshing or not admission.is_idle():
+        return
+    try:
+        ticket = admission.admit(REFRESH_CALLER, cost=1)
+    except HTTPException:
+        # Sin presupuesto: se sigue sirviendo la versión vencida
+        return
+    _refreshing.add(key)
+
+    async def refresh():
+        try:
+            async with ticket, httpx.AsyncClient() as http_client:
+                await ticket.wait_turn()
+                store(await fetch(http_client))
+        except HTTPException:
+            pass
+        finally:
+            _refreshing.discard(key)
+
+    task = asyncio.create_task(refresh())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def get_page(
+    resource: str,
+    fetch,
+    request: Request,
+    page: int,
+    per_page: int,
+    admission: AdmissionController,
+    cache: ResponseCache,
+):
+    """Obtiene la página `page` de `resource`, usando el cache de páginas y cursores.
+
+    Devuelve la respuesta de la API externa o None si no hay más páginas.
+
+    Args:
+        resource: nombre del recurso ("teams" o "players"), usado en las claves.
+        fetch: método del cliente (`get_allteams` o `get_allplayers`).
+    """
+    def page_key(number: int) -> str:
+        return f"cs2:{resource}:{per_page}:page:{number}"
+
+    def cursor_key(number: int) -> str:
+        return f"cs2:{resource}:{per_page}:cursor:{number}"
+
+    def store(number: int, data: dict):
+        # Guarda la página y el cursor de la siguiente
+        cache.set(page_key(number), data)
+        next_cursor = data.get("meta", {}).get("next_cursor")
+        if next_cursor:
+            cache.set(cursor_key(number + 1), next_cursor)
+
+    # Página en cache: no consume presupuesto
+    cached = cache.get(page_key(page))
+    if cached is not None:
+        data, fresh = cached
+        known_cursor = cache.get(cursor_key(page))
+        if not fresh and (page == 1 or known_cursor is not None):
+            cursor = known_cursor[0] if known_cursor else None
+            # Se guarda con `store` para actualizar también el cursor de la siguiente
+            refresh_in_background(
+                page_key(page),
+                lambda http_client: fetch(http_client=http_client, cursor=cursor, per_page=per_page),
+                admission,
+                cache,
+                store=lambda data: store(page, data),
+            )
+        return data
+
+    # Empezar desde la página más cercana con cursor conocido
+    start, cursor = 1, None
+    for number in range(page, 1, -1):
+        known_cursor = cache.get(cursor_key(number))
+        if known_cursor is not None:
+            start, cursor = number, known_cursor[0]
+            break
+
+    # Cada página desde `start` cuesta 1 request a la API externa;
+    # si no entra en el presupuesto se rechaza antes de empezar
+    async with admission.admit(caller_id(request), cost=page - start + 1) as ticket, httpx.AsyncClient() as http_client:
+        # Avanzar hasta la página solicitada (cada vuelta hace 1 request)
+        for number in range(start, page):
+            # Respetar el rate limit (5 requests/min → turnos cada ~12s)
+            await ticket.wait_turn()
+            data = await fetch(http_client=http_client, cursor=cursor, per_page=per_page)
+            store(number, data)
+            cursor = data.get("meta", {}).get("next_cursor")
+            if not cursor:
+                return None
+        # Obtener la página solicitada
+        await ticket.wait_turn()
+        data = await fetch(http_client=http_client, cursor=cursor, per_page=per_page)
+        store(page, data)
+        return data
+
+
+async def get_item(key: str, fetch, request: Request, admission: AdmissionController, cache: ResponseCache):
+    """Obtiene un elemento por ID usando el cache.
+
+    Args:
+        key: clave del cache.
+        fetch: corrutina `fetch(http_client)` que llama a la API externa.
+    """
+    cached = cache.get(key)
+    if cached is not None:
+        data, fresh = cached
+        if not fresh:
+            refresh_in_background(key, fetch, admission, cache)
+        return data
+
+    async with admission.admit(caller_id(request), cost=1) as ticket, httpx.AsyncClient() as http_client:
+        await ticket.wait_turn()
+        data = await fetch(http_client)
+        cache.set(key, data)
+        return data
 
 
 @router.get("/teams", response_model=list[TeamDTO])
-async def get_all_teams(page: int = 1, per_page: int = 100):
+async def get_all_teams(
+    request: Request,
+    page: int = 1,
+    per_page: int = 100,
+    client: CS2BallDontLieClient = Depends(get_client),
+    admission: AdmissionController = Depends(get_admission),
+    cache: ResponseCache = Depends(get_response_cache),
+):
     """Lista equipos CS2 usando paginación por cursor.
 
     Args:
@@ -31,33 +220,41 @@ async def get_all_teams(page: int = 1, per_page: int = 100):
             detail="page y per_page deben ser mayores a 0",
         )
 
-    async with httpx.AsyncClient() as http_client:
-        # Cursor para paginación de la API externa
-        cursor = None
-        # Avanzar hasta la página solicitada (cada vuelta hace 1 request)
-        for _ in range(page - 1):
-            data = await client.get_allteams(http_client=http_client, cursor=cursor, per_page=per_page)
-            cursor = data.get("meta", {}).get("next_cursor")
-            if not cursor:
-                return {"detail": "No hay más páginas disponibles"}
-            # Respetar el rate limit (5 requests/min → ~12s entre requests)
-            await asyncio.sleep(12)
-        # Obtener la página solicitada
-        data = await client.get_allteams(http_client=http_client, cursor=cursor, per_page=per_page)
-        return data.get("data", [])
+    data = await get_page("teams", client.get_allteams, request, page, per_page, admission, cache)
+    if data is None:
+        return {"detail": "No hay más páginas disponibles"}
+    return data.get("data", [])
 
 
 @router.get("/teams/{team_id}", response_model=TeamDTO)
-async def get_team(team_id: int):
+async def get_team(
+    request: Request,
+    team_id: int,
+    client: CS2BallDontLieClient = Depends(get_client),
+    admission: AdmissionController = Depends(get_admission),
+    cache: ResponseCache = Depends(get_response_cache),
+):
     """Obtiene un equipo CS2 por ID."""
     # Obtener un solo equipo por ID
-    async with httpx.AsyncClient() as http_client:
-        data = await client.get_team(team_id, http_client)
-        return data.get("data")
+    data = await get_item(
+        f"cs2:teams:{team_id}",
+        lambda http_client: client.get_team(team_id, http_client),
+        request,
+        admission,
+        cache,
+    )
+    return data.get("data")
 
 
 @router.get("/players", response_model=PlayersResponseDTO)
-async def get_all_players(page: int = 1, per_page: int = 25):
+async def get_all_players(
+    request: Request,
+    page: int = 1,
+    per_page: int = 25,
+    client: CS2BallDontLieClient = Depends(get_client),
+    admission: AdmissionController = Depends(get_admission),
+    cache: ResponseCache = Depends(get_response_cache),
+):
     """Lista jugadores CS2 usando paginación por cursor.
 
     Args:
@@ -71,27 +268,28 @@ async def get_all_players(page: int = 1, per_page: int = 25):
             detail="page y per_page deben ser mayores a 0",
         )
 
-    async with httpx.AsyncClient() as http_client:
-        # Cursor para paginación de la API externa
-        cursor = None
-        # Navegar hasta la página deseada
-        for _ in range(page - 1):
-            data = await client.get_allplayers(http_client=http_client, cursor=cursor, per_page=per_page)
-            cursor = data.get("meta", {}).get("next_cursor")
-            if not cursor:
-                # No hay más páginas
-                return {"detail": "No hay más páginas disponibles"}
-            # Respetar el rate limit (5 requests/min → ~12s entre requests)
-            await asyncio.sleep(12)
-        # Obtener la página solicitada
-        players = await client.get_allplayers(http_client=http_client, cursor=cursor, per_page=per_page)
-        return players
+    players = await get_page("players", client.get_allplayers, request, page, per_page, admission, cache)
+    if players is None:
+        # No hay más páginas
+        return {"detail": "No hay más páginas disponibles"}
+    return players
 
 
 @router.get("/players/{player_id}", response_model=PlayerDTO)
-async def get_player(player_id: int):
+async def get_player(
+    request: Request,
+    player_id: int,
+    client: CS2BallDontLieClient = Depends(get_client),
+    admission: AdmissionController = Depends(get_admission),
+    cache: ResponseCache = Depends(get_response_cache),
+):
     """Obtiene un jugador CS2 por ID."""
     # Obtener un solo jugador por ID
-    async with httpx.AsyncClient() as http_client:
-        data = await client.get_player(player_id, http_client)
-        return data.get("data")
\ No newline at end of file
+    data = await get_item(
+        f"cs2:players:{player_id}",
+        lambda http_client: client.get_player(player_id, http_client),
+        request,
+        admission,
+        cache,
+    )
+    return data.get("data")
@@ -3,7 +3,7 @@
 Define rutas HTTP que exponen equipos y jugadores de NBA.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 import httpx
 from clients.nba_infoclient import NBABallDontLieClient
 from DTOs.nba_infoDTO import PlayersResponseDTO, PlayerDTO, TeamDTO
@@ -12,12 +12,24 @@ from DTOs.nba_infoDTO import PlayersResponseDTO, PlayerDTO, TeamDTO
 # Router para agrupar endpoints de NBA
 router = APIRouter(prefix="/nba", tags=["nba"])
 
-# Cliente que se comunica con la API externa
-client = NBABallDontLieClient()
+# Cliente que se comunica con la API externa (se crea en el primer uso)
+_client: NBABallDontLieClient | None = None
+
+
+async def get_client() -> NBABallDontLieClient:
+    """Devuelve el cliente, creándolo en la primera solicitud.
+
+    Es `async` para correr en el event loop: sin hilos por solicitud y sin
+    carreras al crearlo.
+    """
+    global _client
+    if _client is None:
+        _client = NBABallDontLieClient()
+    return _client
 
 
 @router.get("/teams", response_model=list[TeamDTO])
-async def get_all_teams(page: int = 1, per_page: int = 25):
+async def get_all_teams(page: int = 1, per_page: int = 25, client: NBABallDontLieClient = Depends(get_client)):
     """Lista equipos NBA usando paginación por cursor.
 
     Args:
@@ -46,7 +58,7 @@ async def get_all_teams(page: int = 1, per_page: int = 25):
 
 
 @router.get("/teams/{team_id}", response_model=TeamDTO)
-async def get_team(team_id: int):
+async def get_team(team_id: int, client: NBABallDontLieClient = Depends(get_client)):
     """Obtiene un equipo NBA por ID."""
     # Obtener un solo equipo por ID
     async with httpx.AsyncClient() as http_client:
@@ -55,7 +67,7 @@ async def get_team(team_id: int):
 
 
 @router.get("/players", response_model=PlayersResponseDTO)
-async def get_all_players(page: int = 1, per_page: int = 25):
+async def get_all_players(page: int = 1, per_page: int = 25, client: NBABallDontLieClient = Depends(get_client)):
     """Lista jugadores NBA usando paginación por cursor.
 
     Args:
@@ -84,7 +96,7 @@ async def get_all_players(page: int = 1, per_page: int = 25):
 
 
 @router.get("/players/{player_id}", response_model=PlayerDTO)
-async def get_player(player_id: int):
+async def get_player(player_id: int, client: NBABallDontLieClient = Depends(get_client)):
     """Obtiene un jugador NBA por ID."""
     # Obtener un solo jugador por ID
     async with httpx.AsyncClient() as http_client:
@@ -0,0 +1,76 @@
+"""Controlador de endpoints de perfilado (administración).
+
+Define rutas HTTP para encender el perfilado por muestreo y consultar las
+solicitudes lentas capturadas. Requieren el header `X-Admin-Token`.
+"""
+
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from appsettings import get_settings
+from services.profilingservice import MAX_PROFILE_SECONDS, get_profiler, get_recorder
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)):
+    """Valida el token de administración."""
+    admin_token = get_settings().ADMIN_TOKEN
+    if not admin_token:
+        raise HTTPException(
+            status_code=403,
+            detail="Endpoints de administración deshabilitados: configura ADMIN_TOKEN en el archivo .env",
+        )
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=403, detail="Token de administración inválido")
+
+
+# Router para agrupar endpoints de perfilado
+router = APIRouter(prefix="/admin/profiling", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("")
+async def get_status():
+    """Devuelve el estado del perfilador."""
+    return get_profiler().status()
+
+
+@router.post("/start")
+async def start_profiling(requests: int | None = None, seconds: float | None = None):
+    """Enciende el perfilado por muestreo.
+
+    Args:
+        requests: perfilar las próximas N solicitudes.
+        seconds: perfilar durante esta cantidad de segundos.
+    """
+    # Validación simple de parámetros
+    if requests is None and seconds is None:
+        raise HTTPException(status_code=400, detail="Debes indicar requests o seconds")
+    if (requests is not None and requests < 1) or (seconds is not None and seconds <= 0):
+        raise HTTPException(status_code=400, detail="requests y seconds deben ser mayores a 0")
+    if seconds is not None and seconds > MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds no puede ser mayor a {MAX_PROFILE_SECONDS}")
+    profiler = get_profiler()
+    if profiler.active:
+        raise HTTPException(status_code=409, detail="Ya hay un perfilado en curso")
+
+    profiler.start(requests=requests, seconds=seconds)
+    return profiler.status()
+
+
+@router.post("/stop")
+async def stop_profiling():
+    """Detiene el perfilado; las muestras siguen disponibles."""
+    profiler = get_profiler()
+    profiler.stop()
+    return profiler.status()
+
+
+@router.get("/flamegraph", response_class=PlainTextResponse)
+async def get_flamegraph():
+    """Devuelve las muestras en formato folded (flamegraph.pl, speedscope)."""
+    return get_profiler().folded()
+
+
+@router.get("/slow")
+async def get_slow_requests():
+    """Lista las solicitudes lentas capturadas (más recientes primero)."""
+    return list(reversed(get_recorder().records))
@@ -1,15 +1,79 @@
-"""Punto de entrada principal de la aplicación FastAPI."""
+"""Punto de entrada principal de la aplicación FastAPI.
 
+Los módulos de cada deporte se importan recién al iniciar la app (lifespan)
+y solo los habilitados en `ENABLED_SPORTS`; sus clientes se crean en el
+primer uso. El cache de respuestas se recarga del disco al iniciar y se
+guarda periódicamente y al apagar.
+"""
+
+import asyncio
+import importlib
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from controllers.cs2_infocontroller import router as cs2_router
-from controllers.nba_infocontroller import router as nba_router
-import uvicorn
+from appsettings import get_settings
+from controllers.profilingcontroller import router as profiling_router
+from services.cacheservice import get_cache
+from services.profilingservice import ProfilingMiddleware
+
+# Deportes disponibles: nombre → módulo del controlador que expone `router`
+SPORTS = {
+    "cs2": "controllers.cs2_infocontroller",
+    "nba": "controllers.nba_infocontroller",
+}
+
+
+def register_sports(app: FastAPI, sports: list[str]):
+    """Importa los controladores de los deportes indicados y registra sus routers."""
+    unknown = [sport for sport in sports if sport not in SPORTS]
+    if unknown:
+        raise ValueError(
+            f"Deportes desconocidos en ENABLED_SPORTS: {', '.join(unknown)}. "
+            f"Disponibles: {', '.join(SPORTS)}"
+        )
+    # Evita registrar dos veces si la app se inicia de nuevo (p. ej. en tests)
+    registered = app.state.sports = getattr(app.state, "sports", set())
+    for sport in sports:
+        if sport in registered:
+            continue
+        module = importlib.import_module(SPORTS[sport])
+        app.include_router(module.router)
+        registered.add(sport)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Registra los deportes habilitados y recarga/guarda el cache."""
+    settings = get_settings()
+    register_sports(app, settings.ENABLED_SPORTS)
+
+    if not settings.CACHE_FILE:
+        yield
+        return
+
+    # Arranque en caliente: las entradas vigentes se sirven enseguida
+    cache = get_cache()
+    cache.load(settings.CACHE_FILE)
+    checkpoint = asyncio.create_task(
+        cache.checkpoint_every(settings.CACHE_FILE, settings.CACHE_CHECKPOINT_SECONDS)
+    )
+    try:
+        yield
+    finally:
+        checkpoint.cancel()
+        try:
+            await checkpoint
+        except asyncio.CancelledError:
+            pass
+        # Espera a un guardado que siga en curso en otro hilo y guarda la versión final
+        await cache.flush(settings.CACHE_FILE)
+
+
+app = FastAPI(lifespan=lifespan)
 
-app = FastAPI()
+app.include_router(profiling_router)
 
-# Include the CS2 router
-app.include_router(cs2_router)
-app.include_router(nba_router)
+# Perfilado bajo demanda y captura de solicitudes lentas
+app.add_middleware(ProfilingMiddleware)
 
 @app.get("/")
 async def root():
@@ -17,4 +81,5 @@ async def root():
     return {"mensaje": "Bienvenido a la API de CS2 y NBA"}
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""Control de admisión para la API externa de CS2.
+
+BallDontLie (CS2) permite solo 5 requests por minuto. En lugar de dejar que
+cada petición duerma en un bucle hasta conseguir turno, este módulo reparte
+los turnos del presupuesto y rechaza de inmediato las peticiones que no
+podrían terminar dentro de su plazo (429/503 con `Retry-After`).
+"""
+
+import asyncio
+import math
+import time
+from fastapi import HTTPException
+
+
+class UpstreamBudget:
+    """Presupuesto de requests hacia la API externa.
+
+    Los turnos se entregan en el momento de usarlos (no al admitir), separados
+    por `interval` segundos (60s / 5 requests → 12s entre requests). Así un
+    turno que no se usa nunca queda ocupado.
+    """
+
+    def __init__(self, requests_per_minute: int = 5):
+        """Inicializa el presupuesto con el límite por minuto de la API."""
+        self.interval = 60.0 / max(requests_per_minute, 1)
+        # Momento (reloj monotónico) del próximo turno libre
+        self._next_slot = 0.0
+
+    def estimate_wait(self, turns: int, now: float) -> float:
+        """Segundos hasta el último de `turns` turnos, después de los ya tomados."""
+        start = max(now, self._next_slot)
+        return start + (turns - 1) * self.interval - now
+
+    def take(self, now: float) -> float:
+        """Toma el próximo turno libre y devuelve su momento."""
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        return slot
+
+    def give_back(self, slot: float, now: float):
+        """Devuelve un turno tomado y no usado si es el último entregado."""
+        if math.isclose(self._next_slot, slot + self.interval):
+            self._next_slot = max(now, slot)
+
+
+class AdmissionTicket:
+    """Turnos admitidos para una petición.
+
+    Se usa como context manager asíncrono: al salir se liberan la cuota del
+    llamador y los turnos que no se llegaron a usar.
+    """
+
+    def __init__(self, controller: "AdmissionController", caller: str, cost: int, deadline: float):
+        """Guarda el llamador, la cantidad de turnos admitidos y su plazo."""
+        self.controller = controller
+        self.caller = caller
+        self.cost = cost
+        # Momento (reloj monotónico) en que debe haber tomado su último turno
+        self.deadline = deadline
+        # Momento del último turno tomado (None si todavía no tomó ninguno)
+        self.last_slot: float | None = None
+        self._used = 0
+
+    @property
+    def pending(self) -> int:
+        """Turnos admitidos que todavía no se usaron."""
+        return self.cost - self._used
+
+    async def wait_turn(self):
+        """Toma el próximo turno libre y espera hasta que llegue."""
+        budget = self.controller.budget
+        slot = budget.take(time.monotonic())
+        self.last_slot = slot
+        self._used += 1
+        delay = slot - time.monotonic()
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # Solicitud cancelada mientras esperaba: el turno queda libre
+                budget.give_back(slot, time.monotonic())
+                raise
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.controller.release(self)
+
+
+class AdmissionController:
+    """Decide si una petición puede atenderse con el presupuesto actual.
+
+    Responsabilidades:
+    1. Estimar el costo de la petición (requests a la API externa)
+    2. Rechazar con 503 si no termina dentro de `max_wait_seconds`
+    3. Aplicar una cuota justa por llamador (429) cuando hay varios en cola
+
+    La paginación toma sus turnos de a uno, así que una solicitud barata
+    (1 request) solo espera los turnos ya tomados y no los pendientes de
+    las paginaciones largas. Como cada turno que toma retrasa a esas
+    paginaciones, solo se admite si todas siguen terminando en su plazo.
+    """
+
+    def __init__(self, budget: UpstreamBudget, max_wait_seconds: float = 60.0):
+        """Inicializa el controlador con el presupuesto y el plazo máximo."""
+        self.budget = budget
+        self.max_wait_seconds = max_wait_seconds
+        # Tickets activos por llamador
+        self._tickets: dict[str, list[AdmissionTicket]] = {}
+
+    @property
+    def capacity(self) -> int:
+        """Cantidad de requests que caben dentro del plazo máximo."""
+        return int(self.max_wait_seconds // self.budget.interval) + 1
+
+    @property
+    def pending(self) -> int:
+        """Turnos admitidos que todavía no se tomaron."""
+        return sum(t.pending for tickets in self._tickets.values() for t in tickets)
+
+    def fair_share(self, caller: str) -> int:
+        """Turnos que puede tener en cola un llamador según los activos."""
+        callers = set(self._tickets) | {caller}
+        return max(1, self.capacity // len(callers))
+
+    def is_idle(self) -> bool:
+        """Indica si no hay turnos pendientes ni tomados a futuro."""
+        return self.pending == 0 and self.budget.estimate_wait(1, time.monotonic()) <= 0
+
+    def admit(self, caller: str, cost: int) -> AdmissionTicket:
+        """Admite la petición o lanza HTTPException con `Retry-After`.
+
+        Args:
+            caller: identificador del llamador (IP o header X-Client-Id).
+            cost: cantidad de requests a la API externa que necesita.
+        """
+        now = time.monotonic()
+        cost = max(cost, 1)
+
+        # Cuota justa: con otros llamadores en cola nadie supera su parte
+        held = sum(t.pending for t in self._tickets.get(caller, []))
+        share = self.fair_share(caller)
+        if held + cost > share and set(self._tickets) - {caller}:
+            raise HTTPException(
+                status_code=429,
+                detail="Límite de solicitudes superado: tu solicitud excede tu parte del presupuesto de la API BallDontLie.",
+                headers={"Retry-After": str(max(1, math.ceil(self._others_drain(caller, now))))},
+            )
+
+        # Plazo: una solicitud barata solo espera los turnos ya tomados; una
+        # paginación puede tener que esperar además los pendientes de las demás
+        turns = 1 if cost == 1 else self.pending + cost
+        wait = self.budget.estimate_wait(turns, now)
+        if cost > self.capacity:
+            # Nunca entrará en el plazo, aunque la cola esté vacía
+            raise HTTPException(
+                status_code=503,
+                detail=f"Solicitud demasiado costosa: requiere {cost} requests a la API BallDontLie "
+                       f"y solo se permiten {self.capacity} por solicitud.",
+            )
+        if wait > self.max_wait_seconds:
+            self._reject_saturated(wait - self.max_wait_seconds)
+
+        # Los turnos nuevos se intercalan con los pendientes de las solicitudes
+        # admitidas: en el peor caso su último turno se corre `cost` lugares
+        admitted = [t.deadline for tickets in self._tickets.values() for t in tickets if t.pending]
+        if admitted:
+            last_turn = now + self.budget.estimate_wait(self.pending + cost, now)
+            if last_turn > min(admitted):
+                # Se libera cuando esas solicitudes tomen todos sus turnos
+                self._reject_saturated(self.budget.estimate_wait(self.pending, now))
+
+        ticket = AdmissionTicket(self, caller, cost, deadline=now + self.max_wait_seconds)
+        self._tickets.setdefault(caller, []).append(ticket)
+        return ticket
+
+    def _others_drain(self, caller: str, now: float) -> float:
+        """Segundos hasta que los demás llamadores hayan tomado todos sus turnos.
+
+        Es cuando deja de aplicar la cuota justa: sus tickets terminan.
+        """
+        others = [t for other, tickets in self._tickets.items() if other != caller for t in tickets]
+        # Turnos ya tomados: el último llega en `last_slot`
+        drain = max((t.last_slot for t in others if t.last_slot is not None), default=now)
+        if any(t.pending for t in others):
+            # En el peor caso sus turnos pendientes van después de todos los demás
+            drain = max(drain, now + self.budget.estimate_wait(self.pending, now))
+        return drain - now
+
+    def _reject_saturated(self, retry_after: float):
+        """Rechaza con 503: el presupuesto no alcanza dentro del plazo."""
+        raise HTTPException(
+            status_code=503,
+            detail="Servicio saturado: el presupuesto de la API BallDontLie está agotado.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def release(self, ticket: AdmissionTicket):
+        """Libera la cuota del ticket; sus turnos no usados nunca se tomaron."""
+        tickets = self._tickets.get(ticket.caller, [])
+        if ticket in tickets:
+            tickets.remove(ticket)
+        if not tickets:
+            self._tickets.pop(ticket.caller, None)
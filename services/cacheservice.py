@@ -0,0 +1,265 @@
+"""Cache de respuestas y cursores con persistencia en disco.
+
+Guarda respuestas de la API externa y los cursores de paginación con un
+vencimiento (TTL) en reloj de pared, para que sigan siendo válidos después de
+un reinicio. Se guarda periódicamente y al apagar la app en un archivo
+binario que al iniciar se abre con `mmap`: las claves se leen enseguida y
+cada valor se decodifica recién cuando se pide.
+
+Formato del archivo (little-endian):
+    encabezado: magic b"BDLC", versión (u16), cantidad de entradas (u32)
+    índice:     por entrada: expires_at (f64), key_off, key_len, val_off, val_len (u32)
+    datos:      claves en UTF-8 y valores en JSON (UTF-8)
+"""
+
+import asyncio
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from appsettings import get_settings
+
+MAGIC = b"BDLC"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+INDEX_ENTRY = struct.Struct("<dIIII")
+
+
+class _Entry:
+    """Entrada del cache; `raw` guarda el JSON sin decodificar (mmap)."""
+
+    __slots__ = ("expires_at", "value", "raw")
+
+    def __init__(self, expires_at: float, value=None, raw: memoryview | bytes | None = None):
+        self.expires_at = expires_at
+        self.value = value
+        self.raw = raw
+
+    def decoded(self):
+        """Devuelve el valor, decodificándolo la primera vez."""
+        if self.raw is not None:
+            self.value = json.loads(bytes(self.raw))
+            self.raw = None
+        return self.value
+
+    def encoded(self) -> bytes:
+        """Valor en JSON; si nunca se decodificó se copia tal cual."""
+        raw = self.raw
+        if raw is not None:
+            return bytes(raw)
+        return json.dumps(self.value, separators=(",", ":")).encode()
+
+
+class ResponseCache:
+    """Cache en memoria con TTL, servido "stale" mientras se refresca.
+
+    Responsabilidades:
+    1. Guardar y devolver valores indicando si siguen frescos
+    2. Descartar entradas vencidas hace más de `max_stale_seconds`
+    3. Persistir y recargar su contenido desde un archivo binario
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_stale_seconds: float = 3600.0, max_entries: int = 10000):
+        """Inicializa el cache.
+
+        Args:
+            ttl_seconds: tiempo que una entrada se considera fresca.
+            max_stale_seconds: tiempo extra que se sirve vencida mientras se refresca.
+            max_entries: cantidad máxima de entradas (se descartan las más viejas).
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.max_entries = max_entries
+        self._entries: dict[str, _Entry] = {}
+        # Mapa del último archivo cargado; los valores sin decodificar apuntan aquí
+        self._mmap: mmap.mmap | None = None
+        self._view: memoryview | None = None
+        # Serializa las escrituras al archivo (el orden lo da `flush`)
+        self._write_lock = threading.Lock()
+        # Guardado periódico en curso en otro hilo (sigue aunque se cancele quien lo espera)
+        self._pending_write: asyncio.Future | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> tuple[object, bool] | None:
+        """Devuelve `(valor, fresco)` o None si no existe o es demasiado viejo."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = time.time()
+        if now > entry.expires_at + self.max_stale_seconds:
+            del self._entries[key]
+            return None
+        try:
+            value = entry.decoded()
+        except ValueError:
+            # JSON dañado en el archivo cargado: se trata como ausente
+            del self._entries[key]
+            return None
+        return value, now <= entry.expires_at
+
+    def set(self, key: str, value, ttl_seconds: float | None = None):
+        """Guarda un valor (debe ser serializable a JSON)."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        # Reinsertar al final para que el orden refleje la antigüedad
+        self._entries.pop(key, None)
+        self._entries[key] = _Entry(time.time() + ttl, value)
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def save(self, path: str):
+        """Guarda el contenido en `path` (escritura atómica)."""
+        self._release_mmap()
+        self._write(path, list(self._entries.items()))
+
+    async def save_async(self, path: str):
+        """Igual que `save`, pero escribe el archivo en un hilo aparte."""
+        # La copia se toma en el event loop; la codificación y escritura en otro hilo
+        self._release_mmap()
+        self._pending_write = asyncio.ensure_future(
+            asyncio.to_thread(self._write, path, list(self._entries.items()))
+        )
+        # Cancelar esta espera no detiene el hilo: `flush` lo espera después
+        await asyncio.shield(self._pending_write)
+
+    async def flush(self, path: str):
+        """Espera el guardado periódico en curso y guarda la versión final.
+
+        Sin esperarlo, una copia más vieja que se siga codificando en otro
+        hilo podría escribirse después y reemplazar a la final.
+        """
+        if self._pending_write is not None:
+            try:
+                await self._pending_write
+            except OSError:
+                # Ese guardado falló; el final lo reemplaza igual
+                pass
+            self._pending_write = None
+        self.save(path)
+
+    def _release_mmap(self):
+        """Copia los valores que apuntan al mapa y lo cierra.
+
+        Necesario antes de reemplazar el archivo (en Windows no se puede
+        reemplazar un archivo mapeado).
+        """
+        if self._mmap is None:
+            return
+        for entry in self._entries.values():
+            if isinstance(entry.raw, memoryview):
+                entry.raw = bytes(entry.raw)
+        self._view.release()
+        self._mmap.close()
+        self._mmap = None
+        self._view = None
+
+    def _write(self, path: str, items: list[tuple[str, _Entry]]):
+        """Codifica las entradas en el formato binario y reemplaza el archivo."""
+        now = time.time()
+        encoded = [
+            (key.encode(), entry.encoded(), entry.expires_at)
+            for key, entry in items
+            if now <= entry.expires_at + self.max_stale_seconds
+        ]
+        index = bytearray()
+        data = bytearray()
+        offset = HEADER.size + INDEX_ENTRY.size * len(encoded)
+        for key, value, expires_at in encoded:
+            key_off = offset + len(data)
+            data += key
+            val_off = offset + len(data)
+            data += value
+            index += INDEX_ENTRY.pack(expires_at, key_off, len(key), val_off, len(value))
+
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with self._write_lock:
+            # Archivo temporal único: varios workers pueden compartir `path`
+            with tempfile.NamedTemporaryFile(
+                dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp", delete=False
+            ) as file:
+                file.write(HEADER.pack(MAGIC, VERSION, len(encoded)))
+                file.write(index)
+                file.write(data)
+            try:
+                os.replace(file.name, path)
+            except OSError:
+                os.remove(file.name)
+                raise
+
+    def load(self, path: str) -> int:
+        """Carga entradas desde `path` conservando su TTL.
+
+        Las entradas en memoria tienen prioridad. Devuelve la cantidad de
+        entradas cargadas; si el archivo no existe o no es válido devuelve 0.
+        """
+        try:
+            with open(path, "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # OSError: no existe, es un directorio o no se puede leer;
+            # ValueError: archivo vacío (no se puede mapear)
+            return 0
+
+        if len(mapped) < HEADER.size:
+            mapped.close()
+            return 0
+        magic, version, count = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != VERSION or len(mapped) < HEADER.size + INDEX_ENTRY.size * count:
+            mapped.close()
+            return 0
+
+        view = memoryview(mapped)
+        now = time.time()
+        loaded: dict[str, _Entry] = {}
+        try:
+            for i in range(count):
+                expires_at, key_off, key_len, val_off, val_len = INDEX_ENTRY.unpack_from(
+                    mapped, HEADER.size + i * INDEX_ENTRY.size
+                )
+                if key_off + key_len > len(mapped) or val_off + val_len > len(mapped):
+                    raise ValueError("entrada fuera del archivo")
+                if now > expires_at + self.max_stale_seconds:
+                    continue
+                key = bytes(view[key_off:key_off + key_len]).decode()
+                loaded[key] = _Entry(expires_at, raw=view[val_off:val_off + val_len])
+        except (ValueError, struct.error):
+            # Archivo dañado o ajeno (UnicodeDecodeError es un ValueError): se ignora
+            loaded.clear()
+            view.release()
+            mapped.close()
+            return 0
+
+        # Solo se mantiene un mapa abierto a la vez
+        self._release_mmap()
+        added = 0
+        for key, entry in loaded.items():
+            if key not in self._entries:
+                self._entries[key] = entry
+                added += 1
+        # Se mantiene abierto: los valores sin decodificar apuntan a este mapa
+        self._mmap = mapped
+        self._view = view
+        return added
+
+    async def checkpoint_every(self, path: str, interval_seconds: float):
+        """Guarda el cache cada `interval_seconds` hasta que se cancele."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.save_async(path)
+
+
+@lru_cache
+def get_cache() -> ResponseCache:
+    """Cache compartido por la app (se crea en el primer uso)."""
+    settings = get_settings()
+    return ResponseCache(
+        ttl_seconds=settings.CACHE_TTL_SECONDS,
+        max_stale_seconds=settings.CACHE_MAX_STALE_SECONDS,
+        max_entries=settings.CACHE_MAX_ENTRIES,
+    )
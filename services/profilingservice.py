@@ -0,0 +1,337 @@
+"""Perfilado bajo demanda y captura de solicitudes lentas.
+
+Contiene:
+- `SamplingProfiler`: muestrea la pila del hilo del event loop durante las
+  próximas N solicitudes o una ventana de tiempo, y exporta el resultado en
+  formato "folded" (compatible con flamegraph.pl, speedscope, etc.).
+- `SlowRequestRecorder`: si una solicitud supera el umbral de latencia, un
+  hilo auxiliar muestrea hasta que termina qué está haciendo: el código que
+  ocupa el event loop (trabajo de CPU) o el `await` en que espera.
+- `ProfilingMiddleware`: middleware ASGI que conecta ambos con la app.
+
+Con el perfilado apagado el costo por solicitud es una comparación y, si la
+captura de lentas está activa, anotarla en un conjunto; una vez superado el
+umbral el muestreo se espacia hasta una muestra por segundo.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from appsettings import get_settings
+
+
+# Límite de seguridad para que un perfilado no quede encendido indefinidamente
+MAX_PROFILE_SECONDS = 300
+
+# Intervalo máximo de muestreo de una solicitud lenta (el intervalo se duplica
+# en cada muestra hasta este valor, así una espera larga cuesta ~1 callback/s)
+MAX_SLOW_SAMPLE_INTERVAL = 1.0
+
+
+def _frame_name(frame) -> str:
+    """Nombre legible de un frame: archivo:función."""
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _thread_stack(frame, root=None) -> str:
+    """Pila de un hilo en formato folded (de la raíz a la hoja).
+
+    Si se indica `root`, la pila empieza en ese frame.
+    """
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        if frame is root:
+            break
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _task_stack(task: asyncio.Task) -> str:
+    """Cadena de `await` de una tarea en formato folded."""
+    names = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        names.append(_frame_name(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return ";".join(names)
+
+
+def _folded(counts: Counter) -> str:
+    """Convierte un contador de pilas en texto folded (`pila cantidad`)."""
+    return "\n".join(f"{stack} {count}" for stack, count in counts.most_common())
+
+
+class SamplingProfiler:
+    """Perfilador por muestreo del hilo del event loop."""
+
+    def __init__(self, interval_ms: float = 5.0):
+        """Inicializa el perfilador con el intervalo de muestreo."""
+        self.interval = interval_ms / 1000
+        self.active = False
+        self.samples: Counter = Counter()
+        self.remaining_requests: int | None = None
+        self.deadline: float | None = None
+        # Evento de la ejecución actual; cada ejecución tiene el suyo
+        self._stop = threading.Event()
+
+    def start(self, requests: int | None = None, seconds: float | None = None):
+        """Empieza a muestrear el hilo actual (el del event loop).
+
+        Args:
+            requests: detenerse después de N solicitudes.
+            seconds: detenerse después de esta cantidad de segundos.
+        """
+        seconds = min(seconds or MAX_PROFILE_SECONDS, MAX_PROFILE_SECONDS)
+        # Detiene una ejecución anterior; el hilo viejo escribe en su propio
+        # contador y evento, así que no se mezcla con la nueva
+        self._stop.set()
+        self._stop = threading.Event()
+        self.samples = Counter()
+        self.remaining_requests = requests
+        self.deadline = time.monotonic() + seconds
+        self.active = True
+        threading.Thread(
+            target=self._run,
+            args=(threading.get_ident(), self._stop, self.samples, self.deadline),
+            name="sampling-profiler",
+            daemon=True,
+        ).start()
+
+    def stop(self):
+        """Detiene el muestreo; las muestras quedan disponibles."""
+        self.active = False
+        self._stop.set()
+
+    def request_finished(self):
+        """Descuenta una solicitud en el modo "próximas N solicitudes"."""
+        if self.remaining_requests is not None:
+            self.remaining_requests -= 1
+            if self.remaining_requests <= 0:
+                self.stop()
+
+    def folded(self) -> str:
+        """Muestras acumuladas en formato folded."""
+        return _folded(self.samples)
+
+    def status(self) -> dict:
+        """Estado actual del perfilador."""
+        seconds_left = None
+        if self.active and self.deadline is not None:
+            seconds_left = max(0.0, round(self.deadline - time.monotonic(), 1))
+        return {
+            "active": self.active,
+            "remaining_requests": self.remaining_requests if self.active else None,
+            "seconds_left": seconds_left,
+            "samples": sum(self.samples.values()),
+        }
+
+    def _run(self, thread_id: int, stop: threading.Event, samples: Counter, deadline: float):
+        """Bucle del hilo muestreador de una ejecución."""
+        while not stop.wait(self.interval):
+            if time.monotonic() >= deadline:
+                # Solo detiene el perfilador si sigue siendo la ejecución actual
+                if stop is self._stop:
+                    self.stop()
+                break
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                samples[_thread_stack(frame)] += 1
+
+
+class SlowRequestWatch:
+    """Seguimiento de una solicitud individual para el `SlowRequestRecorder`."""
+
+    def __init__(self, recorder: "SlowRequestRecorder", method: str, path: str):
+        """Guarda la tarea y el hilo del event loop que atienden la solicitud."""
+        self.recorder = recorder
+        self.method = method
+        self.path = path
+        self.status_code: int | None = None
+        self.started = time.perf_counter()
+        # Segundos atribuidos a cada pila después del umbral
+        self.samples: Counter = Counter()
+        self._last_stack: str | None = None
+        self._last_time = 0.0
+        self._next_sample = self.started + recorder.threshold
+        self._interval = recorder.interval
+        self._task = asyncio.current_task()
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+
+    def sample(self, now: float, frames: dict):
+        """Toma una muestra si corresponde (desde el hilo auxiliar).
+
+        Si el event loop está ejecutando esta solicitud se toma la pila del
+        hilo (trabajo de CPU); si no, la cadena de `await` en que espera.
+        """
+        if now < self._next_sample:
+            return
+        self._attribute(now)
+        frame = frames.get(self._thread_id)
+        if frame is not None and asyncio.current_task(self._loop) is self._task:
+            self._last_stack = _thread_stack(frame, root=self._task.get_coro().cr_frame)
+        else:
+            self._last_stack = _task_stack(self._task)
+        self._next_sample = now + self._interval
+        self._interval = min(self._interval * 2, MAX_SLOW_SAMPLE_INTERVAL)
+
+    def _attribute(self, now: float):
+        """Atribuye el tiempo desde la última muestra a la pila observada."""
+        if self._last_stack is not None:
+            self.samples[self._last_stack] += now - self._last_time
+        self._last_time = now
+
+    def finish(self):
+        """Deja de seguir la solicitud y la registra si fue lenta."""
+        self.recorder.finish(self)
+
+
+class SlowRequestRecorder:
+    """Guarda pila y tiempos de las solicitudes que superan un umbral.
+
+    Un solo hilo auxiliar revisa las solicitudes en curso: a diferencia de un
+    timer del event loop, puede muestrear aunque el handler lo esté bloqueando.
+    """
+
+    def __init__(self, threshold_ms: float, interval_ms: float = 50.0, history: int = 50):
+        """Inicializa el registro.
+
+        Args:
+            threshold_ms: latencia a partir de la cual se captura (0 = apagado).
+            interval_ms: primer intervalo de muestreo una vez superado el umbral.
+            history: cantidad máxima de solicitudes lentas que se guardan.
+        """
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.records: deque = deque(maxlen=history)
+        # Solicitudes en curso; el lock las comparte con el hilo auxiliar
+        self._watches: set[SlowRequestWatch] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Indica si la captura de solicitudes lentas está activa."""
+        return self.threshold > 0
+
+    def watch(self, method: str, path: str) -> SlowRequestWatch:
+        """Empieza a seguir una solicitud desde la tarea actual."""
+        watch = SlowRequestWatch(self, method, path)
+        with self._lock:
+            self._watches.add(watch)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-request-sampler", daemon=True)
+                self._thread.start()
+            self._wake.set()
+        return watch
+
+    def finish(self, watch: SlowRequestWatch):
+        """Deja de seguir una solicitud y la registra si superó el umbral."""
+        now = time.perf_counter()
+        with self._lock:
+            self._watches.discard(watch)
+            watch._attribute(now)
+        duration = now - watch.started
+        if duration >= self.threshold:
+            self.record(watch, duration)
+
+    def record(self, watch: SlowRequestWatch, duration: float):
+        """Registra una solicitud lenta con su desglose de tiempos."""
+        # Folded con milisegundos como peso (flamegraph.pl acepta pesos)
+        weights = Counter({stack: round(seconds * 1000) for stack, seconds in watch.samples.items()})
+        self.records.append({
+            "method": watch.method,
+            "path": watch.path,
+            "status_code": watch.status_code,
+            "duration_ms": round(duration * 1000, 1),
+            "threshold_ms": round(self.threshold * 1000, 1),
+            # Tiempo aproximado por pila (CPU o `await`) después del umbral
+            "breakdown_ms": {
+                stack: round(seconds * 1000, 1)
+                for stack, seconds in watch.samples.most_common()
+            },
+            "stacks": _folded(weights),
+            "finished_at": time.time(),
+        })
+
+    def _run(self):
+        """Bucle del hilo auxiliar: duerme mientras no hay solicitudes en curso."""
+        tick = min(self.interval, self.threshold)
+        while True:
+            self._wake.wait()
+            time.sleep(tick)
+            now = time.perf_counter()
+            frames = sys._current_frames()
+            with self._lock:
+                if not self._watches:
+                    self._wake.clear()
+                for watch in self._watches:
+                    watch.sample(now, frames)
+
+
+@lru_cache
+def get_profiler() -> SamplingProfiler:
+    """Perfilador bajo demanda compartido (se crea en el primer uso)."""
+    return SamplingProfiler(interval_ms=get_settings().PROFILING_SAMPLE_INTERVAL_MS)
+
+
+@lru_cache
+def get_recorder() -> SlowRequestRecorder:
+    """Registro de solicitudes lentas compartido (se crea en el primer uso)."""
+    settings = get_settings()
+    return SlowRequestRecorder(
+        threshold_ms=settings.PROFILING_SLOW_REQUEST_MS,
+        interval_ms=settings.PROFILING_SLOW_SAMPLE_INTERVAL_MS,
+        history=settings.PROFILING_SLOW_REQUEST_HISTORY,
+    )
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI que alimenta el perfilador y el registro de lentas.
+
+    Las rutas de administración (`/admin`) no se cuentan ni se capturan.
+    Starlette lo construye al iniciar la app, no al importar `main`.
+    """
+
+    def __init__(self, app):
+        """Envuelve la app ASGI."""
+        self.app = app
+        self.profiler = get_profiler()
+        self.recorder = get_recorder()
+
+    async def __call__(self, scope, receive, send):
+        # Camino rápido: nada que medir
+        if scope["type"] != "http" or scope["path"].startswith("/admin"):
+            await self.app(scope, receive, send)
+            return
+        if not self.recorder.enabled:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if self.profiler.active:
+                    self.profiler.request_finished()
+            return
+
+        watch = self.recorder.watch(scope["method"], scope["path"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                watch.status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            watch.finish()
+            if self.profiler.active:
+                self.profiler.request_finished()
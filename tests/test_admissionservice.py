@@ -0,0 +1,115 @@
+"""Pruebas del control de admisión (services/admissionservice.py)."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from services.admissionservice import AdmissionController, UpstreamBudget
+
+
+def make_controller() -> AdmissionController:
+    """Presupuesto de 600 requests/min (turnos cada 0.1s) y plazo de 0.5s."""
+    return AdmissionController(UpstreamBudget(600), max_wait_seconds=0.5)
+
+
+def test_error_partway_through_pagination_frees_remaining_turns():
+    admission = make_controller()
+
+    async def scenario():
+        paginated = admission.admit("a", cost=4)
+        single = admission.admit("b", cost=1)
+        # La paginación falla después de su primer request
+        with pytest.raises(RuntimeError):
+            async with paginated as ticket:
+                await ticket.wait_turn()
+                raise RuntimeError("error de la API externa")
+        async with single as ticket:
+            await ticket.wait_turn()
+        # Solo se usaron 2 turnos: el próximo está a lo sumo a un intervalo
+        return admission.budget.estimate_wait(1, time.monotonic())
+
+    assert asyncio.run(scenario()) <= admission.budget.interval
+    assert admission.pending == 0
+    admission.admit("c", cost=4)
+
+
+def test_cheap_request_is_admitted_while_deep_pagination_is_queued():
+    admission = make_controller()
+    # La paginación deja un turno libre dentro de su plazo
+    admission.admit("a", cost=admission.capacity - 1)
+
+    ticket = admission.admit("b", cost=1)
+
+    assert ticket.cost == 1
+
+
+def test_admitted_pagination_finishes_within_deadline_while_cheap_requests_arrive():
+    admission = make_controller()
+
+    async def pagination():
+        started = time.monotonic()
+        async with admission.admit("a", cost=admission.capacity - 1) as ticket:
+            for _ in range(ticket.cost):
+                await ticket.wait_turn()
+        return time.monotonic() - started
+
+    async def cheap(caller: str) -> bool:
+        try:
+            ticket = admission.admit(caller, cost=1)
+        except HTTPException:
+            return False
+        async with ticket:
+            await ticket.wait_turn()
+        return True
+
+    async def scenario():
+        paginated = asyncio.create_task(pagination())
+        cheap_tasks = []
+        # Llega una solicitud barata nueva a cada medio turno
+        while not paginated.done():
+            cheap_tasks.append(asyncio.create_task(cheap(f"c{len(cheap_tasks)}")))
+            await asyncio.sleep(admission.budget.interval / 2)
+        return await paginated, await asyncio.gather(*cheap_tasks)
+
+    elapsed, admitted = asyncio.run(scenario())
+
+    # Margen para la imprecisión de los timers del event loop
+    assert elapsed <= admission.max_wait_seconds + 0.05
+    assert any(admitted)
+
+
+def test_request_over_fair_share_is_rejected_when_others_are_queued():
+    admission = make_controller()
+    admission.admit("a", cost=1)
+
+    with pytest.raises(HTTPException) as exc_info:
+        admission.admit("b", cost=admission.capacity)
+
+    assert exc_info.value.status_code == 429
+    assert int(exc_info.value.headers["Retry-After"]) >= 1
+
+
+def test_fair_share_retry_after_is_when_other_callers_drain():
+    # Turnos cada 12s como en producción
+    admission = AdmissionController(UpstreamBudget(5), max_wait_seconds=60)
+
+    async def scenario():
+        # Un turno ya usado: el de "a" (el único que tiene) llega en 12s
+        async with admission.admit("x", cost=1) as ticket:
+            await ticket.wait_turn()
+        single = admission.admit("a", cost=1)
+        waiting = asyncio.create_task(single.wait_turn())
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                admission.admit("b", cost=6)
+        finally:
+            waiting.cancel()
+        return exc_info.value
+
+    exc = asyncio.run(scenario())
+
+    assert exc.status_code == 429
+    assert int(exc.headers["Retry-After"]) == 12
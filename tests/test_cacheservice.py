@@ -0,0 +1,122 @@
+"""Pruebas del cache persistente (services/cacheservice.py)."""
+
+import asyncio
+import os
+import threading
+import time
+
+from services.cacheservice import HEADER, INDEX_ENTRY, MAGIC, VERSION, ResponseCache, _Entry
+
+
+def test_save_and_load_keep_ttl(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    cache = ResponseCache(ttl_seconds=100)
+    cache.set("fresca", {"data": [1]})
+    cache.set("vencida", {"data": [2]}, ttl_seconds=-10)
+    cache.save(path)
+
+    reloaded = ResponseCache()
+
+    assert reloaded.load(path) == 2
+    assert reloaded.get("fresca") == ({"data": [1]}, True)
+    assert reloaded.get("vencida") == ({"data": [2]}, False)
+
+
+def test_load_rejects_entries_outside_the_file(tmp_path):
+    path = tmp_path / "cache.bin"
+    index = INDEX_ENTRY.pack(time.time() + 100, 10_000, 5, 10_005, 5)
+    path.write_bytes(HEADER.pack(MAGIC, VERSION, 1) + index)
+
+    cache = ResponseCache()
+
+    assert cache.load(str(path)) == 0
+    assert len(cache) == 0
+
+
+def test_load_rejects_invalid_keys(tmp_path):
+    path = tmp_path / "cache.bin"
+    offset = HEADER.size + INDEX_ENTRY.size
+    index = INDEX_ENTRY.pack(time.time() + 100, offset, 2, offset + 2, 2)
+    path.write_bytes(HEADER.pack(MAGIC, VERSION, 1) + index + b"\xff\xfe{}")
+
+    assert ResponseCache().load(str(path)) == 0
+
+
+def test_load_ignores_a_path_that_is_not_a_file(tmp_path):
+    assert ResponseCache().load(str(tmp_path)) == 0
+    assert ResponseCache().load(str(tmp_path / "no_existe.bin")) == 0
+
+
+def test_corrupt_value_is_a_cache_miss(tmp_path):
+    path = tmp_path / "cache.bin"
+    offset = HEADER.size + INDEX_ENTRY.size
+    index = INDEX_ENTRY.pack(time.time() + 100, offset, 1, offset + 1, 3)
+    path.write_bytes(HEADER.pack(MAGIC, VERSION, 1) + index + b"k{x}")
+    cache = ResponseCache()
+    cache.load(str(path))
+
+    assert cache.get("k") is None
+
+
+def test_final_save_waits_for_a_write_in_progress(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.bin")
+    cache = ResponseCache()
+    cache.set("vieja", 1)
+    snapshot = list(cache._entries.items())
+
+    # Un guardado periódico lento (en otro hilo) que empezó con la copia vieja
+    original_replace = os.replace
+    started = threading.Event()
+
+    def slow_replace(src, dst):
+        if threading.current_thread() is writer:
+            started.set()
+            time.sleep(0.2)
+        original_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", slow_replace)
+    writer = threading.Thread(target=cache._write, args=(path, snapshot))
+    writer.start()
+    started.wait()
+
+    cache.set("nueva", 2)
+    cache.save(path)
+    writer.join()
+
+    reloaded = ResponseCache()
+    reloaded.load(path)
+    assert reloaded.get("nueva") == (2, True)
+
+
+def test_final_save_waits_for_a_checkpoint_still_encoding(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.bin")
+    cache = ResponseCache()
+    cache.set("vieja", 1)
+
+    # El guardado periódico tarda en codificar (antes de tomar el lock)
+    original_encoded = _Entry.encoded
+
+    def slow_encoded(entry):
+        if threading.current_thread() is not threading.main_thread():
+            time.sleep(0.2)
+        return original_encoded(entry)
+
+    monkeypatch.setattr(_Entry, "encoded", slow_encoded)
+
+    async def shutdown():
+        checkpoint = asyncio.create_task(cache.save_async(path))
+        await asyncio.sleep(0.05)
+        cache.set("nueva", 2)
+        # Mismo orden que el lifespan al apagar
+        checkpoint.cancel()
+        try:
+            await checkpoint
+        except asyncio.CancelledError:
+            pass
+        await cache.flush(path)
+
+    asyncio.run(shutdown())
+
+    reloaded = ResponseCache()
+    reloaded.load(path)
+    assert reloaded.get("nueva") == (2, True)
@@ -0,0 +1,106 @@
+"""Pruebas del perfilado (services/profilingservice.py y su controlador)."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from controllers import profilingcontroller
+from services.profilingservice import SamplingProfiler, SlowRequestRecorder
+
+
+def test_profiler_stops_after_n_requests():
+    profiler = SamplingProfiler()
+    profiler.start(requests=2)
+
+    profiler.request_finished()
+    assert profiler.active
+    profiler.request_finished()
+
+    assert not profiler.active
+
+
+def test_new_run_does_not_mix_samples_with_the_previous_one():
+    profiler = SamplingProfiler(interval_ms=1)
+    profiler.start(seconds=5)
+    time.sleep(0.05)
+    profiler.stop()
+    first_run = profiler.samples
+    first_count = sum(first_run.values())
+
+    profiler.start(seconds=5)
+    time.sleep(0.05)
+    profiler.stop()
+
+    assert first_count > 0
+    assert profiler.samples is not first_run
+    assert sum(first_run.values()) == first_count
+
+
+def test_admin_endpoints_require_the_token(monkeypatch):
+    monkeypatch.setattr(profilingcontroller, "get_settings", lambda: SimpleNamespace(ADMIN_TOKEN="secreto"))
+    monkeypatch.setattr(profilingcontroller, "get_profiler", SamplingProfiler)
+    app = FastAPI()
+    app.include_router(profilingcontroller.router)
+    client = TestClient(app)
+
+    assert client.get("/admin/profiling").status_code == 403
+    assert client.get("/admin/profiling", headers={"X-Admin-Token": "otro"}).status_code == 403
+    assert client.get("/admin/profiling", headers={"X-Admin-Token": "secreto"}).status_code == 200
+
+
+def test_admin_endpoints_are_disabled_without_a_configured_token(monkeypatch):
+    monkeypatch.setattr(profilingcontroller, "get_settings", lambda: SimpleNamespace(ADMIN_TOKEN=None))
+    app = FastAPI()
+    app.include_router(profilingcontroller.router)
+
+    response = TestClient(app).get("/admin/profiling", headers={"X-Admin-Token": ""})
+
+    assert response.status_code == 403
+
+
+def run_slow_request(recorder: SlowRequestRecorder, handler):
+    """Ejecuta `handler` como una solicitud seguida por el registro."""
+
+    async def request():
+        watch = recorder.watch("GET", "/lenta")
+        try:
+            await handler()
+        finally:
+            watch.finish()
+
+    async def scenario():
+        await asyncio.create_task(request())
+
+    asyncio.run(scenario())
+    return recorder.records[-1]
+
+
+def test_slow_await_bound_request_has_a_breakdown():
+    recorder = SlowRequestRecorder(threshold_ms=50, interval_ms=10)
+
+    async def waits():
+        await asyncio.sleep(0.2)
+
+    record = run_slow_request(recorder, waits)
+
+    assert record["breakdown_ms"]
+    assert any("sleep" in stack for stack in record["breakdown_ms"])
+
+
+def test_slow_cpu_bound_request_has_a_breakdown():
+    recorder = SlowRequestRecorder(threshold_ms=50, interval_ms=10)
+
+    async def busy_loop():
+        # Bloquea el event loop: ningún timer del loop puede correr
+        end = time.perf_counter() + 0.2
+        while time.perf_counter() < end:
+            pass
+
+    record = run_slow_request(recorder, busy_loop)
+
+    assert record["breakdown_ms"]
+    assert any("busy_loop" in stack for stack in record["breakdown_ms"])
+    assert record["stacks"]